@@ -9,27 +9,161 @@ from werkzeug.utils import secure_filename
 import traceback
 import webbrowser
 import threading
+import uuid
 
-# Data processing modules
-from data_processing import DataCleaner, DataAnalyzer, DataModeler, DataVisualizer
+# Data processing modules (heavy libraries load lazily inside these classes)
+from data_processing import DataCleaner, DataAnalyzer, DataModeler, DataVisualizer, warm_up
+from data_processing import GroupByEngine, CleaningHistory
+from data_processing import optimize_dtypes, memory_usage, preview_records
+from dataset_store import SharedDataStore
+import serialization
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['DOWNLOAD_FOLDER'] = 'downloads'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 
+# orjson-backed jsonify (NumPy arrays, NaN -> null) and gzip for large responses
+serialization.init_app(app)
+
 # Ensure folders exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['DOWNLOAD_FOLDER'], exist_ok=True)
 
-# Store current dataframe in session
-current_data = {}
+# Store current dataframe in session. Under serve.py the workers are separate
+# processes, so the data lives in a shared memory-mapped store instead.
+if os.environ.get('DATAPRO_SHARED_DIR'):
+    current_data = SharedDataStore(os.environ['DATAPRO_SHARED_DIR'])
+else:
+    current_data = {}
+
+# Held for every load -> change -> save of the cleaning history
+_history_lock = threading.Lock()
 
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls'}
 
+# Threads for a parallel group-by request. serve.py lowers this to the cores
+# left per worker, since every worker may be aggregating at the same time.
+GROUPBY_THREADS = int(os.environ.get('DATAPRO_GROUPBY_THREADS') or os.cpu_count() or 1)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def store_frame(key, df, version=None):
+    """Store a frame together with a new version key for the analysis caches
+
+    The frame and its version are one entry, so a reader can never pair a
+    frame with another frame's version.
+    """
+    current_data[key] = (version or uuid.uuid4().hex, df)
+
+def get_frame(key='df'):
+    """Frame stored under ``key`` and its version, read together"""
+    version, df = current_data[key]
+    return df, version
+
+def history_lock():
+    """Lock that serializes changes to the cleaning history across threads and workers"""
+    if isinstance(current_data, SharedDataStore):
+        return current_data.named_lock('history')
+    return _history_lock
+
+def new_history():
+    """Cleaning history for the uploaded frame
+
+    Under serve.py its columns go to the shared store, written once each,
+    so workers attach to them instead of unpickling every version. Version
+    0 links to the uploaded frame's own files instead of writing them again.
+    """
+    df, version = get_frame('df')
+    if isinstance(current_data, SharedDataStore):
+        columns = current_data.column_store('history')
+        tag, refs, index_ref = columns.link_frame(current_data, 'df')
+        if tag != version:
+            raise RuntimeError('The uploaded data changed while the history was created')
+        return CleaningHistory(df, columns=columns, root_refs=(refs, index_ref))
+    return CleaningHistory(df)
+
+def load_history():
+    """Cleaning history moved to the latest saved pointer, or None"""
+    history = current_data.get('history')
+    if history is None:
+        return None
+    return history.view(current_data.get('history_pointer'))
+
+def save_history(history, tree_changed=True):
+    """Save the pointer, and the version tree only when steps were added
+
+    Undo, redo and checkout only rewrite the small pointer record.
+    """
+    if tree_changed:
+        current_data['history'] = history
+    current_data['history_pointer'] = history.pointer()
+
+def discard_history():
+    """Free the stored columns of the current history, if any"""
+    history = current_data.get('history')
+    if history is not None:
+        history.discard()
+    current_data.pop('history', None)
+    current_data.pop('history_pointer', None)
+
+def cleaned_frame():
+    """Current cleaning version and its version key, or None before any cleaning"""
+    history = load_history()
+    if history is None or history.current == 0:
+        return None
+    return history.frame, history.version_key
+
+def working_frame():
+    """Cleaned frame if there is one, else the uploaded frame, with its version"""
+    return cleaned_frame() or get_frame('df')
+
+def cleaned_response(df, message, history):
+    """JSON body describing a cleaning version"""
+    return {
+        'success': True,
+        'message': message,
+        'shape': df.shape,
+        'preview': preview_records(df),
+        'missing': df.isnull().sum().to_dict(),
+        'memory': memory_usage(df),
+        'history': history.summary()
+    }
+
+def positive_int(value, name):
+    """Parse a request value as an integer >= 1 (None stays None)"""
+    if value is None:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        number = value
+    elif isinstance(value, str) and value.strip().isdigit():
+        number = int(value)
+    else:
+        number = 0
+    if number < 1:
+        raise ValueError(f'{name} must be a positive integer')
+    return number
+
+def run_groupby(df, version, spec):
+    """Aggregate the working frame as described by a group-by request body"""
+    if not isinstance(spec, dict):
+        raise ValueError('Group-by request must be a JSON object')
+    
+    fields = {}
+    for field, default in (('by', []), ('measures', []), ('aggs', ['sum'])):
+        value = spec.get(field) or default
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f"'{field}' must be a string or a list of strings")
+        fields[field] = value
+    by, measures, aggs = fields['by'], fields['measures'], fields['aggs']
+    n_jobs = GROUPBY_THREADS if spec.get('parallel') else 1
+    
+    engine = GroupByEngine(df, version=version)
+    return engine.aggregate(by, measures, aggs, n_jobs=n_jobs)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -58,8 +192,15 @@ def upload_file():
         else:
             df = pd.read_excel(filepath)
         
-        # Store in session
-        current_data['df'] = df
+        # Shrink dtypes before anything else touches the frame
+        memory_before = memory_usage(df)
+        df = optimize_dtypes(df)
+        memory_after = memory_usage(df)
+        
+        # Store in session (a new upload replaces any earlier cleaned data)
+        with history_lock():
+            discard_history()
+            store_frame('df', df)
         current_data['filename'] = filename
         current_data['filepath'] = filepath
         
@@ -68,8 +209,12 @@ def upload_file():
             'shape': df.shape,
             'columns': df.columns.tolist(),
             'dtypes': df.dtypes.astype(str).to_dict(),
-            'head': df.head(10).to_dict('records'),
-            'missing': df.isnull().sum().to_dict()
+            'head': preview_records(df),
+            'missing': df.isnull().sum().to_dict(),
+            'memory': {
+                'before': memory_before,
+                'after': memory_after
+            }
         }
         
         return jsonify({
@@ -87,17 +232,48 @@ def get_data_preview():
         if 'df' not in current_data:
             return jsonify({'error': 'No data loaded'}), 400
         
-        df = current_data['df']
+        df, _ = get_frame('df')
         return jsonify({
             'shape': df.shape,
             'columns': df.columns.tolist(),
             'dtypes': df.dtypes.astype(str).to_dict(),
             'head': df.head(10).to_html(),
-            'stats': df.describe().to_dict()
+            'stats': serialization.split_frame(df.describe())
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def clean_steps(history, data):
+    """Apply the cleaning options of a request as history steps"""
+    # Steps are added on top of the current version, or of base_version
+    # to branch off an earlier one
+    if data.get('base_version') is not None:
+        history.checkout(int(data['base_version']))
+    
+    cleaner = DataCleaner(history.frame)
+    
+    def apply_step(step, result):
+        # Each step works on the previous step's optimized output
+        cleaner.df = history.apply(step, optimize_dtypes(result))
+        return cleaner.df
+    
+    # Apply cleaning operations
+    if data.get('handle_missing'):
+        method = data.get('missing_method', 'drop')
+        apply_step(f'missing values: {method}', cleaner.handle_missing_values(method=method))
+    
+    if data.get('remove_duplicates'):
+        apply_step('remove duplicates', cleaner.remove_duplicates())
+    
+    if data.get('handle_outliers'):
+        method = data.get('outlier_method', 'iqr')
+        apply_step(f'outliers: {method}', cleaner.handle_outliers(method=method))
+    
+    if data.get('normalize'):
+        columns = data.get('normalize_columns', [])
+        if columns:
+            apply_step('normalize', cleaner.normalize_data(columns=columns))
+
 @app.route('/api/clean-data', methods=['POST'])
 def clean_data():
     try:
@@ -105,37 +281,64 @@ def clean_data():
             return jsonify({'error': 'No data loaded'}), 400
         
         data = request.json
-        df = current_data['df'].copy()
-        
-        cleaner = DataCleaner(df)
-        
-        # Apply cleaning operations
-        if data.get('handle_missing'):
-            method = data.get('missing_method', 'drop')
-            df = cleaner.handle_missing_values(method=method)
-        
-        if data.get('remove_duplicates'):
-            df = cleaner.remove_duplicates()
-        
-        if data.get('handle_outliers'):
-            df = cleaner.handle_outliers(method=data.get('outlier_method', 'iqr'))
-        
-        if data.get('normalize'):
-            columns = data.get('normalize_columns', [])
-            if columns:
-                df = cleaner.normalize_data(columns=columns)
         
-        # Store cleaned data
-        current_data['df_cleaned'] = df
-        
-        return jsonify({
-            'success': True,
-            'message': 'Data cleaned successfully',
-            'shape': df.shape,
-            'preview': df.head(10).to_dict('records'),
-            'missing': df.isnull().sum().to_dict()
-        }), 200
+        with history_lock():
+            saved = load_history() or new_history()
+            
+            # Steps go on a copy, so a failing step leaves the saved history as it was
+            history = saved.copy()
+            try:
+                clean_steps(history, data)
+            except Exception:
+                history.release(saved)
+                raise
+            
+            # Store cleaned data
+            history.prune()
+            save_history(history)
+        
+        return jsonify(cleaned_response(history.frame, 'Data cleaned successfully', history)), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/history', methods=['GET'])
+def get_history():
+    if 'df' not in current_data:
+        return jsonify({'error': 'No data loaded'}), 400
+    
+    history = load_history() or CleaningHistory(get_frame('df')[0])
+    return jsonify({'success': True, 'history': history.summary()}), 200
+
+@app.route('/api/history/<action>', methods=['POST'])
+def change_history_version(action):
+    try:
+        if 'history' not in current_data:
+            return jsonify({'error': 'No cleaning history'}), 400
+        
+        with history_lock():
+            history = load_history()
+            
+            if action == 'undo':
+                history.undo()
+            elif action == 'redo':
+                history.redo()
+            elif action == 'checkout':
+                data = request.json or {}
+                if data.get('version') is None:
+                    return jsonify({'error': 'No version given'}), 400
+                history.checkout(int(data['version']))
+            else:
+                return jsonify({'error': 'Unknown history action'}), 400
+            
+            save_history(history, tree_changed=False)
+        message = f"Switched to version {history.current} ({history.versions[history.current]['step']})"
+        return jsonify(cleaned_response(history.frame, message, history)), 200
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -145,7 +348,7 @@ def exploratory_analysis():
         if 'df' not in current_data:
             return jsonify({'error': 'No data loaded'}), 400
         
-        df = current_data.get('df_cleaned', current_data['df'])
+        df, _ = working_frame()
         analyzer = DataAnalyzer(df)
         
         # Get EDA results
@@ -170,7 +373,7 @@ def build_model():
             return jsonify({'error': 'No data loaded'}), 400
         
         data = request.json
-        df = current_data.get('df_cleaned', current_data['df'])
+        df, _ = working_frame()
         
         task_type = data.get('task_type')
         target_column = data.get('target_column')
@@ -208,14 +411,15 @@ def create_visualization():
             return jsonify({'error': 'No data loaded'}), 400
         
         data = request.json
-        df = current_data.get('df_cleaned', current_data['df'])
+        df, version = working_frame()
         
         viz_type = data.get('viz_type')
         columns = data.get('columns', [])
         color = data.get('color', '#1f77b4')
         title = data.get('title', f'{viz_type} Chart')
         
-        visualizer = DataVisualizer(df)
+        visualizer = DataVisualizer(df, version=version)
+        groupby = data.get('groupby')
         
         if viz_type == 'scatter':
             if len(columns) >= 2:
@@ -224,7 +428,10 @@ def create_visualization():
                 return jsonify({'error': 'Scatter plot needs 2 columns'}), 400
         
         elif viz_type == 'bar':
-            if len(columns) >= 1:
+            if groupby:
+                grouped = run_groupby(df, version, groupby)
+                fig_html = visualizer.create_grouped_bar(grouped, grouped.columns[0], color=color, title=title)
+            elif len(columns) >= 1:
                 fig_html = visualizer.create_bar(columns[0], color=color, title=title)
             else:
                 return jsonify({'error': 'Bar chart needs at least 1 column'}), 400
@@ -236,11 +443,21 @@ def create_visualization():
                 return jsonify({'error': 'Histogram needs at least 1 column'}), 400
         
         elif viz_type == 'heatmap':
-            fig_html = visualizer.create_heatmap()
+            if groupby:
+                grouped = run_groupby(df, version, groupby)
+                pivot = GroupByEngine.pivot(grouped, grouped.columns[0])
+                fig_html = visualizer.create_heatmap(pivot=pivot, title=title)
+            else:
+                fig_html = visualizer.create_heatmap()
         
         elif viz_type == 'line':
             if len(columns) >= 2:
-                fig_html = visualizer.create_line(columns[0], columns[1], color=color, title=title)
+                fig_html = visualizer.create_line(
+                    columns[0], columns[1], color=color, title=title,
+                    max_points=positive_int(data.get('max_points'), 'max_points') or 1000,
+                    resolution=data.get('resolution'),
+                    rolling_window=positive_int(data.get('rolling_window'), 'rolling_window')
+                )
             else:
                 return jsonify({'error': 'Line chart needs 2 columns'}), 400
         
@@ -258,16 +475,51 @@ def create_visualization():
             'chart': fig_html
         }), 200
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/groupby', methods=['POST'])
+def groupby_analysis():
+    try:
+        if 'df' not in current_data:
+            return jsonify({'error': 'No data loaded'}), 400
+        
+        data = request.json
+        df, version = working_frame()
+        
+        grouped = run_groupby(df, version, data)
+        result = {
+            'success': True,
+            'by': list(grouped.index.names),
+            'keys': [list(key) if isinstance(key, tuple) else [key] for key in grouped.index],
+            'columns': grouped.columns.tolist(),
+            'values': grouped.to_numpy()
+        }
+        
+        # Two group columns can also be returned as a rows x columns table
+        pivot_column = data.get('pivot')
+        if pivot_column:
+            if pivot_column not in grouped.columns:
+                return jsonify({'error': f'Unknown pivot column: {pivot_column}'}), 400
+            result['pivot'] = serialization.split_frame(GroupByEngine.pivot(grouped, pivot_column))
+        
+        return jsonify(result), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/export-data', methods=['GET'])
 def export_data():
     try:
-        if 'df_cleaned' not in current_data:
+        cleaned = cleaned_frame() if 'df' in current_data else None
+        if cleaned is None:
             return jsonify({'error': 'No cleaned data to export'}), 400
         
-        df = current_data['df_cleaned']
+        df, _ = cleaned
         filename = f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         filepath = os.path.join(app.config['DOWNLOAD_FOLDER'], filename)
         
@@ -289,7 +541,7 @@ def export_visualization():
         data = request.json
         viz_type = data.get('viz_type')
         
-        df = current_data.get('df_cleaned', current_data['df'])
+        df, _ = working_frame()
         visualizer = DataVisualizer(df)
         
         filename = f"viz_{viz_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
@@ -314,7 +566,7 @@ def get_columns():
         if 'df' not in current_data:
             return jsonify({'error': 'No data loaded'}), 400
         
-        df = current_data['df']
+        df, _ = get_frame('df')
         numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
         all_cols = df.columns.tolist()
         
@@ -328,17 +580,28 @@ def get_columns():
 
 @app.route('/api/clear', methods=['POST'])
 def clear_data():
-    current_data.clear()
+    with history_lock():
+        current_data.clear()
     return jsonify({'success': True, 'message': 'Data cleared'}), 200
 
 def open_browser():
     """Open browser after a delay to ensure server is ready"""
     webbrowser.open('http://127.0.0.1:5000/')
 
+def start_warm_up():
+    """Load the analysis libraries in the background so the first request is fast"""
+    thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
 if __name__ == '__main__':
     # Start browser in a separate thread with a small delay
     timer = threading.Timer(1.5, open_browser)
     timer.daemon = True
     timer.start()
     
+    # Set DATAPRO_WARMUP=0 to skip preloading sklearn/plotly/matplotlib
+    if os.environ.get('DATAPRO_WARMUP', '1') != '0':
+        start_warm_up()
+    
     app.run(debug=True, host='127.0.0.1', port=5000, threaded=True, use_reloader=False)
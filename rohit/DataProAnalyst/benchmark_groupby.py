@@ -0,0 +1,60 @@
+"""
+Group-By Benchmark for DataPro Analyst
+Compares single-threaded aggregation with row partitions on a thread pool,
+for several frame sizes, to check where "parallel": true starts to pay off
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_processing import GroupByEngine
+
+def make_frame(n_rows, n_groups):
+    """Two group columns and one numeric measure"""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'region': rng.integers(0, 20, n_rows),
+        'product': rng.integers(0, n_groups, n_rows),
+        'sales': rng.normal(100, 25, n_rows)
+    })
+
+def best_time(engine, aggs, n_jobs, repeat):
+    """Fastest of several aggregations, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.aggregate(['region', 'product'], ['sales'], aggs, n_jobs=n_jobs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    """Run the group-by benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark serial vs threaded group-by aggregation')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 4_000_000, 8_000_000])
+    parser.add_argument('--groups', type=int, default=1000, help='distinct products')
+    parser.add_argument('--threads', type=int, default=GroupByEngine.MAX_THREADS)
+    parser.add_argument('--repeat', type=int, default=5, help='runs per setting')
+    args = parser.parse_args()
+
+    print(f"Cores: {os.cpu_count()}  Threads: {args.threads}  "
+          f"Min rows per partition: {GroupByEngine.MIN_PARTITION_ROWS:,}")
+    print("=" * 50)
+    for n_rows in args.rows:
+        engine = GroupByEngine(make_frame(n_rows, args.groups), version=f'benchmark-{n_rows}')
+        engine.group_index(['region', 'product'])  # Time the aggregation, not the cached codes
+        partitions = engine.partitions(n_rows, args.threads)
+
+        for aggs in (['sum', 'mean'], ['min', 'max']):
+            serial = best_time(engine, aggs, 1, args.repeat)
+            parallel = best_time(engine, aggs, args.threads, args.repeat)
+            print(f"{n_rows:>10,} rows {'+'.join(aggs):<9} serial {serial * 1000:8.1f} ms  "
+                  f"{partitions} partition(s) {parallel * 1000:8.1f} ms  ({serial / parallel:.2f}x)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
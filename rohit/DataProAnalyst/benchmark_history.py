@@ -0,0 +1,81 @@
+"""
+Cleaning History Check for DataPro Analyst
+Measures the bytes each cleaning version keeps alive and the time to switch
+between versions. Fails if a version retains more than the columns it changed.
+"""
+
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_processing import CleaningHistory, DataCleaner
+
+# Allowed slack over the changed columns' own size (index, small objects)
+RETAINED_TOLERANCE = 1.05
+
+def make_frame(n_rows, n_columns):
+    """Numeric frame where only the first column has missing values"""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_columns)),
+                      columns=[f'col_{i}' for i in range(n_columns)])
+    df.loc[rng.choice(n_rows, n_rows // 20, replace=False), 'col_0'] = np.nan
+    return df
+
+def changed_bytes(history, version_id):
+    """Size of the columns a version changed, counted on their own"""
+    version = history.versions[version_id]
+    frame = history.frame_of(version_id)
+    return sum(int(frame[col].memory_usage(index=False, deep=True)) for col in version['changed'])
+
+def check_version(history, version_id, label):
+    """Print and check the bytes one version retains"""
+    retained = history.retained_bytes(version_id)
+    expected = changed_bytes(history, version_id)
+    ok = retained <= expected * RETAINED_TOLERANCE
+    mark = '✓' if ok else '✗'
+    changed = len(history.versions[version_id]['changed'])
+    print(f"{mark} {label}: {changed} changed column(s), retains {retained / 1e6:.2f} MB "
+          f"(changed columns: {expected / 1e6:.2f} MB)")
+    return ok
+
+def main():
+    """Run the cleaning history check"""
+    parser = argparse.ArgumentParser(description='Check memory and switch time of the cleaning history')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--columns', type=int, default=20)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.columns)
+    print(f"Frame: {args.rows:,} rows x {args.columns} columns ({df.memory_usage().sum() / 1e6:.1f} MB)")
+    history = CleaningHistory(df)
+
+    # Mean fill rewrites every numeric column, but only col_0 actually changes
+    mean_filled = DataCleaner(history.frame).handle_missing_values(method='mean')
+    history.apply('missing values: mean', mean_filled)
+    ok = check_version(history, 1, 'mean fill')
+
+    # Branch off the original with a different method
+    history.checkout(0)
+    median_filled = DataCleaner(history.frame).handle_missing_values(method='median')
+    history.apply('missing values: median', median_filled)
+    ok &= check_version(history, 2, 'median fill (branch)')
+
+    timings = []
+    for action in [history.undo, history.redo] * 50:
+        start = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - start)
+    print(f"Undo/redo: {max(timings) * 1e6:.0f} µs worst case over {len(timings)} switches")
+
+    print("=" * 50)
+    if not ok:
+        print("✗ A version retains more memory than the columns it changed")
+        return 1
+    print("✅ Each version retains only its changed columns")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Serialization Benchmark for DataPro Analyst
+Compares encoding a wide correlation response the old way (nested to_dict()
+through the standard json module) with the split/NumPy serializer
+"""
+
+import sys
+import gzip
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import serialization
+
+def make_correlation(n_columns, n_rows=500):
+    """Correlation matrix of a random frame with n_columns columns"""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_columns)),
+                      columns=[f'col_{i}' for i in range(n_columns)])
+    return df.corr()
+
+def encode_nested(corr):
+    """Previous behaviour: p x p nested dict of boxed floats through stdlib json"""
+    return json.dumps(corr.to_dict()).encode('utf-8')
+
+def encode_split(corr):
+    """Current behaviour: column names plus one NumPy array"""
+    return serialization.dumps_bytes({
+        'columns': corr.columns.tolist(),
+        'values': np.ascontiguousarray(corr.to_numpy())
+    })
+
+def best_time(func, arg, repeat):
+    """Fastest of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    """Run the serialization benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoding of a wide correlation matrix')
+    parser.add_argument('--columns', type=int, default=1000, help='number of numeric columns')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per encoder')
+    args = parser.parse_args()
+
+    corr = make_correlation(args.columns)
+    print(f"Correlation matrix: {args.columns} x {args.columns} ({corr.size:,} values)")
+    print(f"Fast encoder backend: {serialization.backend_name()}")
+
+    nested = best_time(encode_nested, corr, args.repeat)
+    split = best_time(encode_split, corr, args.repeat)
+    payload = encode_split(corr)
+    compress = lambda data: gzip.compress(data, compresslevel=serialization.GZIP_LEVEL)
+    compressed = best_time(compress, payload, args.repeat)
+
+    print("=" * 50)
+    print(f"to_dict + json:   {nested * 1000:8.1f} ms  ({len(encode_nested(corr)) / 1e6:.1f} MB)")
+    print(f"split + {serialization.backend_name():<9} {split * 1000:8.1f} ms  ({len(payload) / 1e6:.1f} MB)")
+    print(f"gzip of split:    {compressed * 1000:8.1f} ms  "
+          f"({len(compress(payload)) / 1e6:.1f} MB)")
+    print(f"Speedup: {nested / split:.1f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
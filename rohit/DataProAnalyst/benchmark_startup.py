@@ -0,0 +1,65 @@
+"""
+Startup Benchmark for DataPro Analyst
+Measures the time from a fresh Python process to the first served index.html
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Seconds allowed from launch to the first served page
+STARTUP_BUDGET = 2.0
+
+# Runs inside a fresh interpreter so no module is already cached
+PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+import app
+response = app.app.test_client().get('/')
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('sklearn', 'plotly', 'matplotlib', 'seaborn', 'scipy') if name in sys.modules]
+print(json.dumps({'elapsed': elapsed, 'status': response.status_code, 'heavy': heavy}))
+'''
+
+def measure_startup():
+    """Launch a fresh interpreter and time import + first request to '/'"""
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, DATAPRO_WARMUP='0')
+    output = subprocess.check_output([sys.executable, '-c', PROBE], cwd=app_dir, env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+def main():
+    """Run the startup benchmark and fail if the budget is exceeded"""
+    parser = argparse.ArgumentParser(description='Measure DataPro Analyst cold start time')
+    parser.add_argument('--runs', type=int, default=5, help='number of cold starts to measure')
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET, help='allowed seconds to first page')
+    args = parser.parse_args()
+
+    print(f"Measuring {args.runs} cold starts...")
+    timings = []
+    for i in range(args.runs):
+        result = measure_startup()
+        if result['status'] != 200:
+            print(f"✗ Run {i + 1}: '/' returned status {result['status']}")
+            return 1
+        if result['heavy']:
+            print(f"⚠ Run {i + 1}: heavy modules loaded at startup: {', '.join(result['heavy'])}")
+        timings.append(result['elapsed'])
+        print(f"  Run {i + 1}: {result['elapsed']:.3f}s")
+
+    best = min(timings)
+    median = sorted(timings)[len(timings) // 2]
+    print("=" * 50)
+    print(f"Best: {best:.3f}s  Median: {median:.3f}s  Budget: {args.budget:.3f}s")
+
+    if median > args.budget:
+        print("✗ Startup time is over budget")
+        return 1
+
+    print("✅ Startup time is within budget")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,26 +1,119 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_squared_error, accuracy_score, classification_report
-from sklearn.cluster import KMeans
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+import importlib
+import importlib.util
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
+import math
 import base64
+import threading
+import re
+import uuid
+import warnings
+from collections import OrderedDict
+
+# sklearn, plotly, matplotlib, seaborn and scipy are imported inside the
+# methods that use them so the server can start serving before they load.
+HEAVY_MODULES = [
+    'sklearn.preprocessing',
+    'sklearn.linear_model',
+    'sklearn.ensemble',
+    'sklearn.model_selection',
+    'sklearn.metrics',
+    'sklearn.cluster',
+    'scipy.stats',
+    'plotly.graph_objects',
+    'plotly.express',
+    'matplotlib.pyplot',
+    'seaborn',
+]
+
+
+def warm_up():
+    """Import the heavy analysis libraries ahead of the first request"""
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Warm-up could not import {name}: {e}")
+
+
+def memory_usage(df):
+    """Total memory of a DataFrame in bytes, including string contents"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _string_dtype():
+    """Arrow-backed strings when pyarrow is installed, else pandas' nullable strings"""
+    if importlib.util.find_spec('pyarrow') is not None:
+        return 'string[pyarrow]'
+    return 'string'
+
+
+# A string column becomes ``category`` only when it has at most this share of
+# distinct values and no more than MAX_CATEGORIES of them
+CATEGORY_RATIO = 0.05
+MAX_CATEGORIES = 1000
+
+
+def _is_low_cardinality(n_unique, n_rows, category_ratio, max_categories):
+    return n_unique <= max_categories and n_unique <= category_ratio * n_rows
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_RATIO, max_categories=MAX_CATEGORIES):
+    """Store each column in the smallest dtype that holds its values exactly
+
+    - strings with few distinct values become ``category``, others nullable strings
+    - integers are downcast to the narrowest width that fits their min/max
+    - floats become float32 only when every value round-trips unchanged
+    """
+    df = df.copy(deep=False)
+    n_rows = len(df)
+    
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        
+        if isinstance(dtype, pd.CategoricalDtype):
+            series = series.cat.remove_unused_categories()
+            # Filtering can leave a category column that is no longer low-cardinality
+            if (pd.api.types.infer_dtype(series.cat.categories, skipna=True) == 'string'
+                    and not _is_low_cardinality(len(series.cat.categories), n_rows,
+                                                category_ratio, max_categories)):
+                series = series.astype(_string_dtype())
+            df[col] = series
+        
+        elif dtype == object:
+            if n_rows == 0 or pd.api.types.infer_dtype(series, skipna=True) != 'string':
+                continue
+            if _is_low_cardinality(series.nunique(), n_rows, category_ratio, max_categories):
+                df[col] = series.astype('category')
+            else:
+                df[col] = series.astype(_string_dtype())
+        
+        elif pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        
+        elif dtype == np.float64:
+            narrowed = series.astype(np.float32)
+            if np.array_equal(narrowed.to_numpy(), series.to_numpy(), equal_nan=True):
+                df[col] = narrowed
+    
+    return df
+
+
+def preview_records(df, n=10):
+    """First rows as JSON-safe records (missing values become None)"""
+    head = df.head(n).astype(object)
+    return head.where(head.notna(), None).to_dict('records')
+
 
 class DataCleaner:
     def __init__(self, df):
         self.df = df.copy()
     
-    def handle_missing_values(self, method='drop'):
-        """Handle missing values"""
+    def handle_missing_values(self, method='drop', time_column=None):
+        """Handle missing values (fills follow time order when there is a date column)"""
         df = self.df.copy()
         
         if method == 'drop':
@@ -31,13 +124,29 @@ class DataCleaner:
         elif method == 'median':
             numeric_cols = df.select_dtypes(include=np.number).columns
             df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-        elif method == 'forward_fill':
-            df = df.ffill()
-        elif method == 'backward_fill':
-            df = df.bfill()
+        elif method in ('forward_fill', 'backward_fill'):
+            df = self._fill_in_time_order(df, method, time_column)
         
         return df
     
+    def _fill_in_time_order(self, df, method, time_column=None):
+        """Forward/backward fill along the time axis, keeping the original row order"""
+        engine = TimeSeriesEngine(df)
+        if time_column is None:
+            datetime_columns = engine.detect_datetime_columns()
+            time_column = datetime_columns[0] if datetime_columns else None
+        
+        if time_column is None:
+            return df.ffill() if method == 'forward_fill' else df.bfill()
+        
+        _, order = engine.time_order(time_column)
+        # Rows without a timestamp go last
+        order = np.concatenate([order, np.setdiff1d(np.arange(len(df)), order)])
+        
+        filled = df.iloc[order]
+        filled = filled.ffill() if method == 'forward_fill' else filled.bfill()
+        return filled.iloc[np.argsort(order)]
+    
     def remove_duplicates(self):
         """Remove duplicate rows"""
         return self.df.drop_duplicates()
@@ -66,6 +175,8 @@ class DataCleaner:
     
     def normalize_data(self, columns=None, method='standard'):
         """Normalize data"""
+        from sklearn.preprocessing import StandardScaler, MinMaxScaler
+        
         df = self.df.copy()
         cols = columns or df.select_dtypes(include=np.number).columns
         
@@ -79,6 +190,287 @@ class DataCleaner:
         return df
 
 
+def _retained_buffers(values):
+    """(id, bytes) of the buffer a column keeps alive, following views to their base"""
+    if isinstance(values, pd.RangeIndex):
+        return id(values), values.nbytes
+    if isinstance(values.dtype, np.dtype):
+        array = values.to_numpy()
+        while isinstance(array.base, np.ndarray):
+            array = array.base
+        return id(array), array.nbytes
+    if isinstance(values, pd.Index):
+        return id(values), int(values.memory_usage(deep=True))
+    return id(values), int(values.memory_usage(index=False, deep=True))
+
+
+class CleaningHistory:
+    """Versioned cleaning steps stored as a tree of copy-on-write snapshots
+
+    Version 0 is the uploaded frame. Each cleaning step adds a child of the
+    current version; stepping from a version that already has children starts
+    a new branch. A version is only metadata: column names and references
+    into ``columns``, a write-once mapping of ref -> Series. A step stores
+    standalone copies of the columns it changed under new unique refs and
+    reuses its parent's refs for the rest, so memory grows only with the
+    changed columns.
+
+    ``columns`` is a plain dict by default; under serve.py it is a
+    SharedColumnStore, so each column is written once as a mappable file.
+    Undo, redo and checkout only move the ``current`` pointer (see
+    ``pointer()``), and ``prune()`` drops the oldest versions beyond
+    ``max_versions``.
+    """
+    
+    MAX_VERSIONS = 50
+    
+    def __init__(self, df, columns=None, max_versions=MAX_VERSIONS, root_refs=None):
+        """``root_refs`` is ``(column refs, index ref)`` if ``columns`` already holds ``df``"""
+        self.id = uuid.uuid4().hex
+        self.columns = {} if columns is None else columns
+        self.max_versions = max_versions
+        self.versions = {}
+        self.current = 0
+        self.redo_targets = {}
+        self._next_id = 1
+        self._frames = {}
+        
+        if root_refs is None:
+            # The uploaded frame is kept anyway, so a plain dict references its columns
+            refs = [self._store(df.iloc[:, i]) for i in range(df.shape[1])]
+            index_ref = self._store(df.index)
+        else:
+            refs, index_ref = root_refs
+        self.versions[0] = {'parent': None, 'step': 'original', 'children': [],
+                            'names': list(df.columns), 'refs': list(refs), 'index': index_ref,
+                            'changed': list(df.columns), 'owned': list(refs) + [index_ref]}
+    
+    def __getstate__(self):
+        # Materialized frames are rebuilt on demand from the column refs
+        state = self.__dict__.copy()
+        state['_frames'] = {}
+        return state
+    
+    def _store(self, values):
+        """Store a column (or index) under a new unique ref"""
+        ref = f'{self.id}/{uuid.uuid4().hex}'
+        self.columns[ref] = values
+        return ref
+    
+    def copy(self):
+        """Independent copy of the version tree that shares the stored columns
+
+        Steps are applied to a copy, so a failing step leaves the saved
+        history untouched (see ``release``).
+        """
+        other = object.__new__(CleaningHistory)
+        other.__dict__.update(self.__dict__)
+        other.versions = {vid: dict(version, children=list(version['children']))
+                          for vid, version in self.versions.items()}
+        other.redo_targets = dict(self.redo_targets)
+        other._frames = dict(self._frames)
+        return other
+    
+    def view(self, pointer=None):
+        """Copy moved to ``pointer`` for reading; it shares this tree's built frames
+
+        The saved object itself is never moved, so concurrent requests cannot
+        pair one version's frame with another version's key.
+        """
+        other = self.copy()
+        other._frames = self._frames
+        if pointer:
+            other.set_pointer(pointer)
+        return other
+    
+    @property
+    def frame(self):
+        return self.frame_of(self.current)
+    
+    @property
+    def version_key(self):
+        """Stable cache key for the current version"""
+        return f'{self.id}:{self.current}'
+    
+    def frame_of(self, version_id):
+        """DataFrame of a version, built around the stored column buffers"""
+        if version_id not in self._frames:
+            version = self.versions[version_id]
+            arrays = [self.columns[ref].array for ref in version['refs']]
+            # copy=False keeps every column as its own block over the shared buffer
+            df = pd.DataFrame(dict(enumerate(arrays)), index=self.columns[version['index']], copy=False)
+            df.columns = version['names']
+            self._frames[version_id] = df
+        return self._frames[version_id]
+    
+    def apply(self, step, frame):
+        """Record ``frame`` as the result of ``step`` on the current version"""
+        parent_id = self.current
+        parent = self.versions[parent_id]
+        version_id = self._next_id
+        self._next_id += 1
+        owned = []
+        
+        same_rows = frame.index.equals(self.columns[parent['index']])
+        if same_rows:
+            index_ref = parent['index']
+        else:
+            index_ref = self._store(frame.index)
+            owned.append(index_ref)
+        
+        parent_refs = {}
+        if same_rows and len(set(parent['names'])) == len(parent['names']):
+            parent_refs = dict(zip(parent['names'], parent['refs']))
+        
+        refs = []
+        changed = []
+        try:
+            for i, col in enumerate(frame.columns):
+                new = frame.iloc[:, i]
+                ref = parent_refs.get(col)
+                if ref is None or not self.columns[ref].array.equals(new.array):
+                    # A standalone copy, so the step's whole 2-D result block can be freed
+                    ref = self._store(pd.Series(new.array.copy(), name=col, copy=False))
+                    changed.append(col)
+                    owned.append(ref)
+                refs.append(ref)
+        except Exception:
+            # Leave no columns behind for a step that was not recorded
+            for ref in owned:
+                del self.columns[ref]
+            raise
+        
+        self.versions[version_id] = {'parent': parent_id, 'step': step, 'children': [],
+                                     'names': list(frame.columns), 'refs': refs,
+                                     'index': index_ref, 'changed': changed, 'owned': owned}
+        parent['children'].append(version_id)
+        self.redo_targets[parent_id] = version_id
+        self.current = version_id
+        return self.frame
+    
+    def _refs_in_use(self):
+        refs = set()
+        for version in self.versions.values():
+            refs.update(version['refs'])
+            refs.add(version['index'])
+        return refs
+    
+    def release(self, saved):
+        """Free the columns this copy stored that ``saved`` does not use
+
+        Called when steps applied to a copy fail and the copy is dropped.
+        """
+        for ref in self._refs_in_use() - saved._refs_in_use():
+            del self.columns[ref]
+    
+    def prune(self):
+        """Drop the oldest versions beyond ``max_versions`` (never the original or current one)
+
+        Run only after the steps of a request have all succeeded, since the
+        freed columns may still be used by the saved tree until then.
+        """
+        while len(self.versions) > self.max_versions:
+            candidates = [vid for vid in self.versions if vid not in (0, self.current)]
+            if not candidates:
+                break
+            self._remove_version(min(candidates))
+    
+    def _remove_version(self, version_id):
+        """Remove one version, attach its children to its parent and free unused columns"""
+        version = self.versions.pop(version_id)
+        parent = self.versions[version['parent']]
+        
+        position = parent['children'].index(version_id)
+        parent['children'][position:position + 1] = version['children']
+        for child_id in version['children']:
+            self.versions[child_id]['parent'] = version['parent']
+        
+        replacement = self.redo_targets.pop(version_id, None)
+        if replacement is None and version['children']:
+            replacement = version['children'][-1]
+        for vid, target in list(self.redo_targets.items()):
+            if target == version_id:
+                if replacement is None:
+                    del self.redo_targets[vid]
+                else:
+                    self.redo_targets[vid] = replacement
+        
+        self._frames.pop(version_id, None)
+        in_use = self._refs_in_use()
+        for ref in set(version['refs']) | {version['index']}:
+            if ref not in in_use:
+                del self.columns[ref]
+    
+    def discard(self):
+        """Free every stored column (used when a new file replaces this history)"""
+        for ref in self._refs_in_use():
+            if ref in self.columns:
+                del self.columns[ref]
+        self._frames.clear()
+    
+    def undo(self):
+        parent_id = self.versions[self.current]['parent']
+        if parent_id is None:
+            raise ValueError('Nothing to undo')
+        self.redo_targets[parent_id] = self.current
+        self.current = parent_id
+        return self.frame
+    
+    def redo(self):
+        redo_id = self.redo_targets.get(self.current)
+        if redo_id is None:
+            raise ValueError('Nothing to redo')
+        self.current = redo_id
+        return self.frame
+    
+    def checkout(self, version_id):
+        """Switch to any version; the next step taken from there starts a branch"""
+        if version_id not in self.versions:
+            raise ValueError(f'Unknown version: {version_id}')
+        self.current = version_id
+        return self.frame
+    
+    def pointer(self):
+        """The small record undo/redo/checkout change: current version and redo targets"""
+        return {'history': self.id, 'current': self.current, 'redo': dict(self.redo_targets)}
+    
+    def set_pointer(self, pointer):
+        """Move to a pointer saved by another worker, if it belongs to this tree"""
+        if pointer.get('history') != self.id or pointer['current'] not in self.versions:
+            return
+        self.current = pointer['current']
+        self.redo_targets = {vid: target for vid, target in pointer['redo'].items()
+                             if vid in self.versions and target in self.versions}
+    
+    def retained_bytes(self, version_id):
+        """Bytes kept alive by the columns this version added"""
+        buffers = {}
+        for ref in self.versions[version_id]['owned']:
+            buffer_id, size = _retained_buffers(self.columns[ref])
+            buffers[buffer_id] = size
+        return sum(buffers.values())
+    
+    def summary(self):
+        """JSON-ready description of every version"""
+        return {
+            'current': self.current,
+            'can_undo': self.versions[self.current]['parent'] is not None,
+            'can_redo': self.redo_targets.get(self.current) is not None,
+            'versions': [
+                {
+                    'id': version_id,
+                    'parent': version['parent'],
+                    'step': version['step'],
+                    'shape': (len(self.columns[version['index']]), len(version['names'])),
+                    'changed_columns': version['changed'],
+                    'retained_bytes': self.retained_bytes(version_id),
+                    'children': version['children']
+                }
+                for version_id, version in self.versions.items()
+            ]
+        }
+
+
 class DataAnalyzer:
     def __init__(self, df):
         self.df = df
@@ -102,17 +494,22 @@ class DataAnalyzer:
         return stats
     
     def get_correlations(self):
-        """Get correlation matrix"""
+        """Get correlation matrix in split form: column names plus a p x p array"""
         numeric_df = self.df.select_dtypes(include=np.number)
         corr = numeric_df.corr()
-        return corr.to_dict()
+        return {
+            'columns': corr.columns.tolist(),
+            'values': np.ascontiguousarray(corr.to_numpy())
+        }
     
     def get_distributions(self):
         """Get distribution info for all columns"""
         distributions = {}
         
         for col in self.df.columns:
-            if self.df[col].dtype in ['int64', 'float64']:
+            dtype = self.df[col].dtype
+            # Optimized frames hold narrowed widths (int8, float32, ...), not just int64/float64
+            if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype):
                 distributions[col] = {
                     'type': 'numeric',
                     'values': self.df[col].value_counts().head(10).to_dict()
@@ -132,6 +529,11 @@ class DataModeler:
     
     def build_regression_model(self, target_column):
         """Build regression model"""
+        from sklearn.linear_model import LinearRegression
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import r2_score, mean_squared_error
+        
         # Prepare data
         df = self.df.dropna()
         
@@ -176,6 +578,10 @@ class DataModeler:
     
     def build_classification_model(self, target_column):
         """Build classification model"""
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import accuracy_score
+        
         df = self.df.dropna()
         
         numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
@@ -203,6 +609,8 @@ class DataModeler:
     
     def build_clustering_model(self, n_clusters=3):
         """Build clustering model"""
+        from sklearn.cluster import KMeans
+        
         df = self.df.dropna()
         numeric_cols = df.select_dtypes(include=np.number).columns
         
@@ -218,18 +626,406 @@ class DataModeler:
         }
 
 
+class VersionCache:
+    """Small thread-safe LRU for values derived from one dataset version
+
+    Keys start with the dataset version, so a new upload or cleaning step
+    never sees stale entries. A version of None disables caching.
+    """
+    
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, compute):
+        if key[0] is None:
+            return compute()
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+def rolling_stats(values, window):
+    """Rolling mean/std over the last ``window`` points using cumulative sums
+
+    Every window is computed at once from prefix sums, so the cost is O(n)
+    regardless of the window size. NaNs are skipped.
+    """
+    if window < 1:
+        raise ValueError('Rolling window must be at least 1')
+    
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    
+    # Shift by the mean so the sum of squares does not lose precision
+    center = values[valid].mean() if valid.any() else 0.0
+    shifted = np.where(valid, values - center, 0.0)
+    
+    sums = np.concatenate(([0.0], np.cumsum(shifted)))
+    squares = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    n = counts[end] - counts[start]
+    s = sums[end] - sums[start]
+    ss = squares[end] - squares[start]
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(n > 0, s / n + center, np.nan)
+        var = np.where(n > 1, (ss - s * s / n) / (n - 1), np.nan)
+    
+    return {
+        'mean': mean,
+        'std': np.sqrt(np.clip(var, 0, None))
+    }
+
+
+class TimeSeriesEngine:
+    """Datetime detection, sorted time indices and chart-sized resampling"""
+    
+    # (label, pandas frequency, approximate bucket length)
+    RESOLUTIONS = [
+        ('minute', 'min', pd.Timedelta(minutes=1)),
+        ('hour', 'H', pd.Timedelta(hours=1)),
+        ('day', 'D', pd.Timedelta(days=1)),
+        ('week', 'W', pd.Timedelta(weeks=1)),
+        ('month', 'M', pd.Timedelta(days=30)),
+        ('quarter', 'Q', pd.Timedelta(days=91)),
+        ('year', 'A', pd.Timedelta(days=365)),
+    ]
+    
+    # Text that looks like a date: 2023-01-05, 05/01/2023, 5.1.23, Jan 5 2023, 5 January 2023.
+    # Bare numbers such as IDs or years ("1001", "2023") parse as dates but do not match.
+    DATE_PATTERN = re.compile(
+        r'^\s*(\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}'
+        r'|[A-Za-z]{3,9}\.?\s+\d{1,2},?\s+\d{2,4}'
+        r'|\d{1,2}\s+[A-Za-z]{3,9}\.?,?\s+\d{2,4})'
+    )
+    
+    # Share of sampled values that must look like dates
+    DATE_LIKE_RATIO = 0.9
+    
+    _cache = VersionCache()
+    
+    def __init__(self, df, version=None):
+        self.df = df
+        self.version = version
+    
+    def is_datetime_column(self, col):
+        """True for datetime columns and text columns whose values are written as dates
+
+        Text columns qualify only if most sampled values match ``DATE_PATTERN``
+        and all of them parse, so numeric codes are never treated as times.
+        """
+        series = self.df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return True
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            return False
+        
+        sample = series.dropna().astype(str).head(100)
+        if sample.empty:
+            return False
+        date_like = sample.map(lambda value: self.DATE_PATTERN.match(value) is not None)
+        if date_like.mean() < self.DATE_LIKE_RATIO:
+            return False
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            parsed = pd.to_datetime(sample, errors='coerce')
+        return bool(parsed.notna().all())
+    
+    def detect_datetime_columns(self):
+        """Names of all columns that hold dates"""
+        return self._cache.get_or_compute(
+            (self.version, 'datetime_columns'),
+            lambda: [col for col in self.df.columns if self.is_datetime_column(col)]
+        )
+    
+    def time_order(self, col):
+        """Sorted DatetimeIndex of ``col`` and the row positions in that order
+
+        Rows whose timestamp is missing are left out. Computed once per
+        dataset version and column.
+        """
+        def compute():
+            series = self.df[col]
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                series = series.astype(object)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                stamps = pd.to_datetime(series, errors='coerce')
+            if stamps.dt.tz is not None:
+                stamps = stamps.dt.tz_convert(None)
+            stamps = stamps.to_numpy()
+            positions = np.flatnonzero(~np.isnat(stamps))
+            order = positions[np.argsort(stamps[positions], kind='stable')]
+            return pd.DatetimeIndex(stamps[order]), order
+        
+        return self._cache.get_or_compute((self.version, 'time_order', col), compute)
+    
+    def choose_resolution(self, index, max_points):
+        """Finest resolution that gives at most ``max_points`` buckets"""
+        span = index[-1] - index[0]
+        for label, freq, length in self.RESOLUTIONS:
+            if span / length <= max_points:
+                return label, freq
+        label, freq, _ = self.RESOLUTIONS[-1]
+        return label, freq
+    
+    def sorted_series(self, x_col, y_col):
+        """Values of ``y_col`` as a Series indexed by time in ascending order"""
+        index, order = self.time_order(x_col)
+        values = pd.to_numeric(self.df[y_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        return pd.Series(values[order], index=index, name=y_col)
+    
+    def frequency(self, label):
+        """pandas frequency of a resolution label"""
+        for name, freq, _ in self.RESOLUTIONS:
+            if name == label:
+                return freq
+        raise ValueError(f'Unknown resolution: {label}')
+    
+    def resample(self, x_col, y_col, max_points=1000, resolution=None):
+        """Aggregate ``y_col`` over time buckets with mean/min/max bands
+
+        Returns ``(frame, label)``. If the data already fits in ``max_points``
+        and no resolution is requested, the sorted raw points are returned with
+        label ``'raw'``.
+        """
+        if max_points < 1:
+            raise ValueError('max_points must be at least 1')
+        
+        series = self.sorted_series(x_col, y_col)
+        if series.empty:
+            return pd.DataFrame(columns=['mean', 'min', 'max', 'count']), 'raw'
+        
+        if resolution is None:
+            if len(series) <= max_points:
+                frame = pd.DataFrame({'mean': series, 'min': series, 'max': series, 'count': 1})
+                return frame, 'raw'
+            label, freq = self.choose_resolution(series.index, max_points)
+        else:
+            label, freq = resolution, self.frequency(resolution)
+        
+        frame = series.resample(freq).agg(['mean', 'min', 'max', 'count'])
+        return frame[frame['count'] > 0], label
+
+
+class GroupByEngine:
+    """Grouped aggregation over integer group codes
+
+    Each group-by column is reduced to integer codes (categorical columns
+    reuse their existing codes) and the combined group ids are cached per
+    dataset version, so repeated queries on the same dimensions skip the
+    hashing step. Sums, counts and means use ``np.bincount`` over the ids.
+    """
+    
+    # Aggregations that can be computed per partition and merged
+    MERGEABLE = {'sum', 'count', 'mean', 'min', 'max'}
+    
+    # Threads only pay off on large frames: below this many rows per
+    # partition the pool costs more than it saves (see benchmark_groupby.py)
+    MIN_PARTITION_ROWS = 1_000_000
+    MAX_THREADS = 4
+    
+    _cache = VersionCache()
+    
+    def __init__(self, df, version=None):
+        self.df = df
+        self.version = version
+    
+    def group_codes(self, col):
+        """Integer codes (-1 for missing) and sorted labels of one column"""
+        def compute():
+            series = self.df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                return series.cat.codes.to_numpy().astype(np.int64), series.cat.categories
+            codes, uniques = pd.factorize(series, sort=True)
+            return codes.astype(np.int64), pd.Index(uniques)
+        
+        return self._cache.get_or_compute((self.version, 'codes', col), compute)
+    
+    def group_index(self, by):
+        """Dense group id per row (-1 if any key is missing) and the group keys"""
+        def compute():
+            codes, levels = zip(*(self.group_codes(col) for col in by))
+            shape = tuple(len(level) for level in levels)
+            
+            valid = np.ones(len(self.df), dtype=bool)
+            for c in codes:
+                valid &= c >= 0
+            
+            valid_codes = [c[valid] for c in codes]
+            if math.prod(shape) <= np.iinfo(np.int64).max:
+                flat = np.ravel_multi_index(tuple(valid_codes), shape) if valid.any() \
+                    else np.empty(0, dtype=np.int64)
+                observed, dense = np.unique(flat, return_inverse=True)
+                positions = np.unravel_index(observed, shape)
+            else:
+                # The full key space does not fit in int64: combine one column at
+                # a time and renumber densely, so ids stay below the row count
+                dense = valid_codes[0]
+                for c, size in zip(valid_codes[1:], shape[1:]):
+                    _, dense = np.unique(dense * size + c, return_inverse=True)
+                _, first_rows = np.unique(dense, return_index=True)
+                positions = [c[first_rows] for c in valid_codes]
+            
+            ids = np.full(len(self.df), -1, dtype=np.int64)
+            ids[valid] = dense
+            
+            keys = pd.MultiIndex.from_arrays(
+                [level.take(pos) for level, pos in zip(levels, positions)], names=list(by)
+            )
+            return ids, keys
+        
+        return self._cache.get_or_compute((self.version, 'groups', tuple(by)), compute)
+    
+    @staticmethod
+    def _parse_agg(agg):
+        """Quantile for 'median'/'qNN' aggregations, None for the rest"""
+        if agg == 'median':
+            return 0.5
+        if agg.startswith('q') and agg[1:].isdigit():
+            return int(agg[1:]) / 100
+        return None
+    
+    @staticmethod
+    def _partial(ids, values, n_groups, aggs):
+        """Sum/count/min/max of one row partition, one slot per group"""
+        mask = (ids >= 0) & ~np.isnan(values)
+        ids, values = ids[mask], values[mask]
+        
+        partial = {
+            'sum': np.bincount(ids, weights=values, minlength=n_groups),
+            'count': np.bincount(ids, minlength=n_groups).astype(np.float64),
+        }
+        if 'min' in aggs or 'max' in aggs:
+            grouped = pd.Series(values).groupby(ids)
+            for name, fill in (('min', np.inf), ('max', -np.inf)):
+                result = np.full(n_groups, fill)
+                reduced = getattr(grouped, name)()
+                result[reduced.index.to_numpy()] = reduced.to_numpy()
+                partial[name] = result
+        return partial
+    
+    def partitions(self, n_rows, n_jobs):
+        """Number of row partitions to use for ``n_jobs`` requested threads"""
+        return max(1, min(n_jobs, self.MAX_THREADS, n_rows // self.MIN_PARTITION_ROWS))
+    
+    def _merge_partials(self, ids, values, n_groups, aggs, n_jobs):
+        """Aggregate row partitions on a thread pool and combine them"""
+        n_jobs = self.partitions(len(ids), n_jobs)
+        if n_jobs <= 1:
+            return self._partial(ids, values, n_groups, aggs)
+        
+        from concurrent.futures import ThreadPoolExecutor
+        
+        bounds = np.linspace(0, len(ids), n_jobs + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            partials = list(pool.map(
+                lambda i: self._partial(ids[bounds[i]:bounds[i + 1]], values[bounds[i]:bounds[i + 1]],
+                                        n_groups, aggs),
+                range(n_jobs)
+            ))
+        
+        merged = {
+            'sum': np.sum([p['sum'] for p in partials], axis=0),
+            'count': np.sum([p['count'] for p in partials], axis=0),
+        }
+        if 'min' in partials[0]:
+            merged['min'] = np.min([p['min'] for p in partials], axis=0)
+            merged['max'] = np.max([p['max'] for p in partials], axis=0)
+        return merged
+    
+    def aggregate(self, by, measures, aggs=('sum',), n_jobs=1):
+        """Aggregate ``measures`` by the ``by`` columns
+
+        ``aggs`` may contain sum, count, mean, min, max, median and quantiles
+        written as ``qNN`` (e.g. q25, q90). With ``n_jobs`` > 1 the mergeable
+        aggregations of large frames run on up to ``MAX_THREADS`` row
+        partitions of at least ``MIN_PARTITION_ROWS`` rows. Returns a DataFrame
+        indexed by the group keys with one ``<measure>_<agg>`` column each.
+        """
+        by = list(by)
+        if not by or not measures:
+            raise ValueError('Group-by needs at least one group column and one measure')
+        for col in by + list(measures):
+            if col not in self.df.columns:
+                raise ValueError(f'Unknown column: {col}')
+        for measure in measures:
+            if not pd.api.types.is_numeric_dtype(self.df[measure]) or pd.api.types.is_bool_dtype(self.df[measure]):
+                raise ValueError(f'Measure must be numeric: {measure}')
+        for agg in aggs:
+            if not isinstance(agg, str):
+                raise ValueError(f'Aggregation names must be strings: {agg!r}')
+            if agg not in self.MERGEABLE and self._parse_agg(agg) is None:
+                raise ValueError(f'Unknown aggregation: {agg}')
+        
+        ids, keys = self.group_index(by)
+        n_groups = len(keys)
+        result = {}
+        
+        for measure in measures:
+            values = pd.to_numeric(self.df[measure], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            partial = self._merge_partials(ids, values, n_groups, aggs, n_jobs)
+            
+            quantiles = [agg for agg in aggs if self._parse_agg(agg) is not None]
+            if quantiles:
+                mask = ids >= 0
+                grouped = pd.Series(values[mask]).groupby(ids[mask])
+            
+            for agg in aggs:
+                q = self._parse_agg(agg)
+                if q is not None:
+                    column = grouped.quantile(q).reindex(range(n_groups)).to_numpy()
+                elif agg == 'mean':
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        column = partial['sum'] / partial['count']
+                elif agg in ('min', 'max'):
+                    column = np.where(partial['count'] > 0, partial[agg], np.nan)
+                else:
+                    column = partial[agg]
+                result[f'{measure}_{agg}'] = column
+        
+        frame = pd.DataFrame(result, index=keys)
+        if len(by) == 1:
+            frame.index = keys.get_level_values(0)
+        return frame
+    
+    @staticmethod
+    def pivot(frame, column):
+        """Two-dimensional result reshaped to rows x columns for a heatmap"""
+        if frame.index.nlevels != 2:
+            raise ValueError('Pivot needs exactly two group-by columns')
+        return frame[column].unstack()
+
+
 class DataVisualizer:
-    def __init__(self, df):
+    def __init__(self, df, version=None):
         self.df = df
+        self.version = version
     
     def create_scatter(self, x_col, y_col, color='#1f77b4', title='Scatter Plot'):
         """Create scatter plot"""
+        import plotly.express as px
         fig = px.scatter(self.df, x=x_col, y=y_col, title=title)
         fig.update_traces(marker=dict(color=color, size=8))
         return fig.to_html(div_id="chart")
     
     def create_bar(self, col, color='#1f77b4', title='Bar Chart'):
         """Create bar chart"""
+        import plotly.express as px
         value_counts = self.df[col].value_counts()
         fig = px.bar(x=value_counts.index, y=value_counts.values, title=title)
         fig.update_traces(marker_color=color)
@@ -237,32 +1033,98 @@ class DataVisualizer:
     
     def create_histogram(self, col, color='#1f77b4', title='Histogram', bins=30):
         """Create histogram"""
+        import plotly.express as px
         fig = px.histogram(self.df, x=col, nbins=bins, title=title)
         fig.update_traces(marker_color=color)
         return fig.to_html(div_id="chart")
     
-    def create_heatmap(self):
-        """Create correlation heatmap"""
-        numeric_df = self.df.select_dtypes(include=np.number)
-        corr = numeric_df.corr()
+    def create_heatmap(self, pivot=None, title='Correlation Heatmap'):
+        """Create correlation heatmap, or a heatmap of a group-by pivot table"""
+        import plotly.graph_objects as go
+        if pivot is None:
+            numeric_df = self.df.select_dtypes(include=np.number)
+            pivot = numeric_df.corr()
         
         fig = go.Figure(data=go.Heatmap(
-            z=corr.values,
-            x=corr.columns,
-            y=corr.columns,
+            z=pivot.values,
+            x=[str(c) for c in pivot.columns],
+            y=[str(i) for i in pivot.index],
             colorscale='Viridis'
         ))
-        fig.update_layout(title='Correlation Heatmap')
+        fig.update_layout(title=title)
         return fig.to_html(div_id="chart")
     
-    def create_line(self, x_col, y_col, color='#1f77b4', title='Line Chart'):
-        """Create line chart"""
-        fig = px.line(self.df, x=x_col, y=y_col, title=title)
-        fig.update_traces(line=dict(color=color, width=2))
+    def create_grouped_bar(self, grouped, column, color='#1f77b4', title='Bar Chart'):
+        """Create bar chart from a GroupByEngine result (grouped bars for two keys)"""
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        
+        if grouped.index.nlevels == 1:
+            fig.add_trace(go.Bar(x=[str(k) for k in grouped.index], y=grouped[column],
+                                 marker_color=color, name=column))
+        else:
+            table = GroupByEngine.pivot(grouped, column)
+            for series_name in table.columns:
+                fig.add_trace(go.Bar(x=[str(k) for k in table.index], y=table[series_name],
+                                     name=str(series_name)))
+            fig.update_layout(barmode='group', legend_title_text=grouped.index.names[1])
+        
+        fig.update_layout(title=title, xaxis_title=grouped.index.names[0], yaxis_title=column)
+        return fig.to_html(div_id="chart")
+    
+    def create_line(self, x_col, y_col, color='#1f77b4', title='Line Chart',
+                    max_points=1000, resolution=None, rolling_window=None):
+        """Create line chart
+
+        When ``x_col`` holds dates the data is sorted by time and resampled to
+        at most ``max_points`` buckets, drawn as a mean line with a min/max band.
+        ``rolling_window`` adds a rolling mean with a +/- 1 std band. The window
+        counts raw time-ordered points, not buckets; the result is drawn at the
+        last point of each bucket.
+        """
+        import plotly.express as px
+        import plotly.graph_objects as go
+        
+        engine = TimeSeriesEngine(self.df, self.version)
+        if x_col not in engine.detect_datetime_columns():
+            fig = px.line(self.df, x=x_col, y=y_col, title=title)
+            fig.update_traces(line=dict(color=color, width=2))
+            return fig.to_html(div_id="chart")
+        
+        frame, label = engine.resample(x_col, y_col, max_points=max_points, resolution=resolution)
+        
+        fig = go.Figure()
+        if label != 'raw':
+            fig.add_trace(go.Scatter(x=frame.index, y=frame['max'], mode='lines',
+                                     line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=frame.index, y=frame['min'], mode='lines',
+                                     line=dict(width=0), fill='tonexty', opacity=0.3,
+                                     fillcolor=color, name='min / max'))
+        fig.add_trace(go.Scatter(x=frame.index, y=frame['mean'], mode='lines',
+                                 line=dict(color=color, width=2),
+                                 name=y_col if label == 'raw' else f'{y_col} ({label} mean)'))
+        
+        if rolling_window:
+            series = engine.sorted_series(x_col, y_col)
+            rolling = pd.DataFrame(rolling_stats(series.to_numpy(), int(rolling_window)), index=series.index)
+            if label != 'raw':
+                rolling = rolling.resample(engine.frequency(label)).last().reindex(frame.index)
+            
+            fig.add_trace(go.Scatter(x=rolling.index, y=rolling['mean'] + rolling['std'], mode='lines',
+                                     line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=rolling.index, y=rolling['mean'] - rolling['std'], mode='lines',
+                                     line=dict(width=0), fill='tonexty', opacity=0.2,
+                                     fillcolor='#ff7f0e', name='rolling +/- 1 std'))
+            fig.add_trace(go.Scatter(x=rolling.index, y=rolling['mean'], mode='lines',
+                                     line=dict(color='#ff7f0e', width=2, dash='dash'),
+                                     name=f'{rolling_window}-point rolling mean'))
+        
+        fig.update_layout(title=title, xaxis_title=x_col, yaxis_title=y_col)
         return fig.to_html(div_id="chart")
     
     def create_boxplot(self, columns, title='Box Plot'):
         """Create box plot"""
+        import plotly.graph_objects as go
         fig = go.Figure()
         for col in columns:
             fig.add_trace(go.Box(y=self.df[col], name=col))
@@ -271,6 +1133,9 @@ class DataVisualizer:
     
     def save_visualization(self, viz_type, filepath, params):
         """Save visualization as image"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         try:
             plt.figure(figsize=(12, 6))
             
@@ -0,0 +1,422 @@
+"""
+Shared Dataset Store for DataPro Analyst
+Keeps loaded datasets in memory-mapped files so every worker process can attach
+to the same buffers without copying them
+"""
+
+import os
+import json
+import time
+import pickle
+import shutil
+import tempfile
+import threading
+import uuid
+from collections.abc import MutableMapping
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single process, so no lock is needed
+    fcntl = None
+
+MANIFEST = 'manifest.json'
+RETIRED = 'retired.json'
+
+# Replaced entries are deleted only after this many seconds, so a worker that
+# read the old manifest can still finish attaching to them
+RETIRE_GRACE_SECONDS = 60
+
+
+def default_shared_dir():
+    """Prefer RAM-backed /dev/shm so memory maps never touch the disk"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'datapro')
+
+
+def _column_kind(series):
+    """How a column is laid out on disk"""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        return 'npy'
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category'
+    if isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow':
+        return 'arrow'
+    return 'pickle'
+
+
+def write_column(series, prefix):
+    """Write one column under the file prefix; returns the layout used
+
+    NumPy columns and categorical codes are plain .npy files and Arrow strings
+    an Arrow IPC file, all of which can be memory-mapped. Anything else is
+    pickled.
+    """
+    kind = _column_kind(series)
+    if kind == 'npy':
+        np.save(f'{prefix}.npy', series.to_numpy())
+    elif kind == 'category':
+        np.save(f'{prefix}.npy', series.cat.codes.to_numpy())
+        with open(f'{prefix}.pkl', 'wb') as f:
+            pickle.dump(series.dtype, f, protocol=pickle.HIGHEST_PROTOCOL)
+    elif kind == 'arrow':
+        import pyarrow as pa
+        table = pa.table({'values': pa.array(series.array)})
+        with pa.OSFile(f'{prefix}.arrow', 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        with open(f'{prefix}.pkl', 'wb') as f:
+            pickle.dump(series.array, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return kind
+
+
+def read_column(prefix, kind):
+    """Attach to a column written by write_column; returns its values array"""
+    if kind == 'npy':
+        return np.load(f'{prefix}.npy', mmap_mode='r')
+    if kind == 'category':
+        codes = np.load(f'{prefix}.npy', mmap_mode='r')
+        with open(f'{prefix}.pkl', 'rb') as f:
+            dtype = pickle.load(f)
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+    if kind == 'arrow':
+        import pyarrow as pa
+        table = pa.ipc.open_file(pa.memory_map(f'{prefix}.arrow')).read_all()
+        return pd.arrays.ArrowStringArray(table.column('values'))
+    with open(f'{prefix}.pkl', 'rb') as f:
+        return pickle.load(f)
+
+
+def frame_from_arrays(names, arrays, index):
+    """Build a DataFrame around existing column arrays without copying them"""
+    # copy=False keeps each column in its own block instead of consolidating
+    df = pd.DataFrame(dict(enumerate(arrays)), index=index, copy=False)
+    df.columns = list(names)
+    return df
+
+
+def write_frame(df, path):
+    """Write a DataFrame as one file per column plus metadata"""
+    os.makedirs(path)
+    columns = []
+    for i, col in enumerate(df.columns):
+        kind = write_column(df.iloc[:, i], os.path.join(path, f'col_{i}'))
+        columns.append((col, kind))
+
+    with open(os.path.join(path, 'meta.pkl'), 'wb') as f:
+        pickle.dump({'columns': columns, 'index': df.index}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_frame(path):
+    """Attach to a stored DataFrame; mappable columns stay backed by the shared files"""
+    with open(os.path.join(path, 'meta.pkl'), 'rb') as f:
+        meta = pickle.load(f)
+
+    arrays = [read_column(os.path.join(path, f'col_{i}'), kind)
+              for i, (_, kind) in enumerate(meta['columns'])]
+    return frame_from_arrays([col for col, _ in meta['columns']], arrays, meta['index'])
+
+
+class SharedDataStore(MutableMapping):
+    """Dict-like replacement for ``current_data`` that is shared between processes.
+
+    Values are written once to ``root`` and listed in a manifest with a version
+    number. Each process caches what it has attached and only re-reads an entry
+    when another process has published a newer version. A ``(tag, DataFrame)``
+    tuple is stored as one entry, so the tag and frame are always read together.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._cache = {}
+
+    def _lock(self, shared=False, name='.lock'):
+        handle = open(os.path.join(self.root, name), 'a')
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        return handle
+    
+    def named_lock(self, name):
+        """Exclusive cross-process lock for a read-modify-write of several entries
+
+        It uses its own lock file, so entries can still be read and written
+        while it is held.
+        """
+        return self._lock(name=f'.{name}.lock')
+
+    def _read_json(self, name, default):
+        try:
+            with open(os.path.join(self.root, name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return default
+
+    def _write_json(self, name, value):
+        tmp_path = os.path.join(self.root, f'{name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, os.path.join(self.root, name))
+
+    def _read_manifest(self):
+        return self._read_json(MANIFEST, {})
+
+    def _retire(self, paths):
+        """Queue entry directories for deletion once the grace period is over
+
+        Must be called with the exclusive lock held.
+        """
+        now = time.time()
+        retired = self._read_json(RETIRED, [])
+        retired.extend([path, now] for path in paths)
+
+        keep = []
+        for path, retired_at in retired:
+            if now - retired_at >= RETIRE_GRACE_SECONDS:
+                # Workers that still map the old files keep them alive until they re-attach
+                shutil.rmtree(os.path.join(self.root, path), ignore_errors=True)
+            else:
+                keep.append([path, retired_at])
+        self._write_json(RETIRED, keep)
+
+    def __getitem__(self, key):
+        # The shared lock keeps writers from retiring files while we attach
+        with self._lock(shared=True):
+            entry = self._read_manifest().get(key)
+            if entry is None:
+                self._cache.pop(key, None)
+                raise KeyError(key)
+
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == entry['version']:
+                return cached[1]
+
+            path = os.path.join(self.root, entry['path'])
+            if entry['kind'] in ('frame', 'tagged_frame'):
+                value = read_frame(path)
+                if entry['kind'] == 'tagged_frame':
+                    value = (entry['tag'], value)
+            else:
+                with open(os.path.join(path, 'value.pkl'), 'rb') as f:
+                    value = pickle.load(f)
+
+        self._cache[key] = (entry['version'], value)
+        return value
+
+    def __setitem__(self, key, value):
+        tagged = (isinstance(value, tuple) and len(value) == 2
+                  and isinstance(value[1], pd.DataFrame))
+
+        with self._lock():
+            manifest = self._read_manifest()
+            old = manifest.get(key)
+            version = old['version'] + 1 if old else 1
+            entry = {
+                'version': version,
+                'kind': 'tagged_frame' if tagged else 'frame' if isinstance(value, pd.DataFrame) else 'object',
+                'path': f'{key}-{os.getpid()}-{version}',
+            }
+
+            path = os.path.join(self.root, entry['path'])
+            if tagged:
+                entry['tag'] = value[0]
+                write_frame(value[1], path)
+            elif entry['kind'] == 'frame':
+                write_frame(value, path)
+            else:
+                os.makedirs(path)
+                with open(os.path.join(path, 'value.pkl'), 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            manifest[key] = entry
+            self._write_json(MANIFEST, manifest)
+            self._retire([old['path']] if old else [])
+
+        # Re-read frames so this worker holds the shared mapping, not a private copy
+        self._cache.pop(key, None)
+
+    def __delitem__(self, key):
+        with self._lock():
+            manifest = self._read_manifest()
+            entry = manifest.pop(key)
+            self._write_json(MANIFEST, manifest)
+            self._retire([entry['path']])
+        self._cache.pop(key, None)
+
+    def __contains__(self, key):
+        with self._lock(shared=True):
+            return key in self._read_manifest()
+
+    def __iter__(self):
+        with self._lock(shared=True):
+            return iter(list(self._read_manifest()))
+
+    def __len__(self):
+        with self._lock(shared=True):
+            return len(self._read_manifest())
+
+    def clear(self):
+        with self._lock():
+            manifest = self._read_manifest()
+            self._write_json(MANIFEST, {})
+            paths = [entry['path'] for entry in manifest.values()]
+            if os.path.isdir(os.path.join(self.root, 'columns')):
+                paths.extend(os.path.join('columns', name)
+                             for name in os.listdir(os.path.join(self.root, 'columns')))
+            self._retire(paths)
+        self._cache.clear()
+
+    def column_store(self, namespace):
+        """Write-once column storage under ``namespace`` (see SharedColumnStore)"""
+        return SharedColumnStore(self.root, namespace)
+
+    def retire(self, paths):
+        """Delete entry directories (relative to root) after the grace period"""
+        with self._lock():
+            self._retire(paths)
+
+
+class SharedColumnStore(MutableMapping):
+    """Write-once mapping of key -> Series or Index, stored as mappable files
+
+    Each key is written to its own directory and never changed afterwards, so
+    every process can cache what it attached. Pickling this object only
+    records its location, not the data.
+    """
+
+    def __init__(self, root, namespace):
+        self.root = root
+        self.namespace = namespace
+        # Attached values by key. Held per instance: when a newer history is
+        # loaded the old one is dropped with its maps, so their RAM is freed
+        # once the files are deleted.
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'root': self.root, 'namespace': self.namespace}
+
+    def __setstate__(self, state):
+        self.__init__(state['root'], state['namespace'])
+
+    def _relative(self, key):
+        return os.path.join('columns', self.namespace, key)
+
+    def _path(self, key):
+        return os.path.join(self.root, self._relative(key))
+
+    def _check_same(self, key, value):
+        """A key is written once; writing it again must carry the same data"""
+        if not self[key].equals(value):
+            raise ValueError(f'Column {key} is already stored with different data')
+
+    def _publish(self, key, write):
+        """Run ``write(directory)`` in a temporary directory and rename it to ``key``
+
+        Readers never see half a column. Returns False if the key already exists.
+        """
+        path = self._path(key)
+        if os.path.isdir(path):
+            return False
+
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        os.makedirs(tmp_path)
+        write(tmp_path)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:  # Another worker wrote the same key first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return False
+        return True
+
+    def __setitem__(self, key, value):
+        is_index = isinstance(value, pd.Index)
+        kind = 'range' if isinstance(value, pd.RangeIndex) else None
+
+        def write(directory):
+            meta = {'kind': kind, 'is_index': is_index, 'name': value.name,
+                    'range': value if kind == 'range' else None}
+            if kind is None:
+                series = pd.Series(value) if is_index else value
+                meta['kind'] = write_column(series, os.path.join(directory, 'values'))
+            with open(os.path.join(directory, 'meta.pkl'), 'wb') as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if not self._publish(key, write):
+            self._check_same(key, value)
+
+    def link_frame(self, store, key):
+        """Reference the column files of frame ``key`` in ``store`` without copying
+
+        Returns ``(tag, column keys, index key)``. The new keys read the frame
+        entry's own files, so the data is held once in shared memory.
+        """
+        prefix = uuid.uuid4().hex
+        with store._lock(shared=True):
+            entry = store._read_manifest()[key]
+            with open(os.path.join(store.root, entry['path'], 'meta.pkl'), 'rb') as f:
+                meta = pickle.load(f)
+
+            keys = []
+            for i, (col, kind) in enumerate(meta['columns']):
+                source = os.path.join(entry['path'], f'col_{i}')
+                link = {'kind': kind, 'is_index': False, 'name': col, 'range': None, 'source': source}
+
+                def write(directory, link=link):
+                    with open(os.path.join(directory, 'meta.pkl'), 'wb') as f:
+                        pickle.dump(link, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+                self._publish(f'{prefix}/{i}', write)
+                keys.append(f'{prefix}/{i}')
+
+        index_key = f'{prefix}/index'
+        self[index_key] = meta['index']
+        return entry.get('tag'), keys, index_key
+
+    def __getitem__(self, key):
+        path = self._path(key)
+        with self._cache_lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        try:
+            with open(os.path.join(path, 'meta.pkl'), 'rb') as f:
+                meta = pickle.load(f)
+        except FileNotFoundError:
+            raise KeyError(key)
+
+        if meta['kind'] == 'range':
+            value = meta['range']
+        else:
+            # Linked columns read the files of the frame entry they came from
+            prefix = os.path.join(self.root, meta['source']) if meta.get('source') else os.path.join(path, 'values')
+            values = read_column(prefix, meta['kind'])
+            if meta['is_index']:
+                value = pd.Index(values, name=meta['name'], copy=False)
+            else:
+                value = pd.Series(values, name=meta['name'], copy=False)
+
+        with self._cache_lock:
+            self._cache[key] = value
+        return value
+
+    def __delitem__(self, key):
+        with self._cache_lock:
+            self._cache.pop(key, None)
+        SharedDataStore(self.root).retire([self._relative(key)])
+
+    def __contains__(self, key):
+        return os.path.isdir(self._path(key))
+
+    def __iter__(self):
+        directory = os.path.join(self.root, 'columns', self.namespace)
+        if not os.path.isdir(directory):
+            return iter([])
+        return iter([name for name in os.listdir(directory) if not name.endswith('.tmp')])
+
+    def __len__(self):
+        return len(list(iter(self)))
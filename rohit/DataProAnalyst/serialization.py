@@ -0,0 +1,146 @@
+"""
+Fast JSON Serialization for DataPro Analyst
+Encodes API responses with orjson (NumPy arrays written directly, NaN/Inf as
+null) and falls back to the standard library when orjson is not installed.
+Large responses are gzip-compressed for clients that accept it.
+"""
+
+import gzip
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_SIZE = 64 * 1024
+GZIP_LEVEL = 5
+
+
+def split_frame(df):
+    """Columnar form of a DataFrame; the values stay one NumPy array"""
+    return {
+        'index': df.index.tolist(),
+        'columns': df.columns.tolist(),
+        'data': np.ascontiguousarray(df.to_numpy()),
+    }
+
+
+def _default(obj):
+    """Encode the pandas/NumPy objects neither backend handles natively"""
+    if isinstance(obj, pd.DataFrame):
+        return split_frame(obj)
+    if isinstance(obj, pd.Series):
+        return obj.to_dict()
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        # orjson only writes C-contiguous numeric arrays natively
+        if obj.dtype.kind in 'biuf' and not obj.flags['C_CONTIGUOUS']:
+            return np.ascontiguousarray(obj)
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _sanitize(obj):
+    """Replace NaN/Inf with None and unbox NumPy values (stdlib fallback only)"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {_sanitize_key(k): _sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(v) for v in obj]
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+        return np.where(np.isfinite(obj), obj, None).tolist()
+    try:
+        converted = _default(obj)
+    except TypeError:
+        return obj
+    return _sanitize(converted)
+
+
+def _sanitize_key(key):
+    if isinstance(key, (str, int, float, bool)) or key is None:
+        return key
+    return str(_sanitize(key))
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        """Encode to UTF-8 JSON bytes with orjson"""
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    def dumps_bytes(obj):
+        """Encode to UTF-8 JSON bytes with the standard library"""
+        return json.dumps(_sanitize(obj), allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(data):
+        return json.loads(data)
+
+
+def backend_name():
+    """Name of the JSON encoder in use"""
+    return 'orjson' if orjson is not None else 'json'
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider that makes ``jsonify`` use :func:`dumps_bytes`"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand the encoded bytes straight to the response, no str round trip
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def compress_response(response, min_size=GZIP_MIN_SIZE):
+    """Gzip a large JSON response when the client accepts gzip"""
+    from flask import request
+
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype != 'application/json'
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Content-Length'] = len(response.get_data())
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app, min_size=GZIP_MIN_SIZE):
+    """Install the fast JSON provider and gzip compression on a Flask app"""
+    app.json = FastJSONProvider(app)
+    app.after_request(lambda response: compress_response(response, min_size))
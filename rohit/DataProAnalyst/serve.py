@@ -0,0 +1,121 @@
+"""
+Production Server for DataPro Analyst
+Runs the Flask app under a multi-process gunicorn worker pool. Loaded datasets
+live in a shared memory-mapped store so any worker can serve any request.
+
+Usage:
+    python serve.py --workers 8 --port 8000
+"""
+
+import os
+import sys
+import atexit
+import shutil
+import argparse
+import multiprocessing
+
+from dataset_store import default_shared_dir
+
+
+def build_options(args):
+    """Translate command line arguments into gunicorn settings"""
+    return {
+        'bind': f'{args.host}:{args.port}',
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        # Load the app (and warm-up imports) once in the master, then fork
+        'preload_app': True,
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # Another user's process
+        return True
+    return True
+
+
+def prepare_shared_dir(base):
+    """Create an empty store directory for this run and remove ones left by dead runs
+
+    Each run gets its own ``run-<pid>`` directory, so datasets from a previous
+    run (or another server on the host) never show up as loaded.
+    """
+    os.makedirs(base, exist_ok=True)
+    for name in os.listdir(base):
+        if name.startswith('run-') and name[4:].isdigit() and not _pid_alive(int(name[4:])):
+            shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+    run_dir = os.path.join(base, f'run-{os.getpid()}')
+    shutil.rmtree(run_dir, ignore_errors=True)
+    os.makedirs(run_dir)
+    
+    master_pid = os.getpid()
+    def remove_run_dir():
+        # Forked workers inherit this handler and exit through sys.exit on
+        # timeouts and reloads; only the master may delete the live store
+        if os.getpid() == master_pid:
+            shutil.rmtree(run_dir, ignore_errors=True)
+    
+    atexit.register(remove_run_dir)
+    return run_dir
+
+
+def main():
+    """Start the multi-process production server"""
+    parser = argparse.ArgumentParser(description='Run DataPro Analyst with a multi-process worker pool')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--threads', type=int, default=1, help='threads per worker')
+    parser.add_argument('--timeout', type=int, default=300, help='seconds before a busy worker is restarted')
+    parser.add_argument('--shared-dir', default=default_shared_dir(),
+                        help='directory holding the memory-mapped datasets')
+    args = parser.parse_args()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("ERROR: gunicorn is required for production mode (Linux/macOS).")
+        print("On Windows, run 'python app.py' instead.")
+        return 1
+
+    # app.py switches current_data to the shared store when this is set
+    shared_dir = prepare_shared_dir(args.shared_dir)
+    os.environ['DATAPRO_SHARED_DIR'] = shared_dir
+    # Workers already take one core each; a parallel group-by gets the rest
+    os.environ['DATAPRO_GROUPBY_THREADS'] = str(max(1, multiprocessing.cpu_count() // args.workers))
+
+    from app import app
+    from data_processing import warm_up
+
+    # Forked workers inherit the already-imported analysis libraries
+    warm_up()
+
+    class DataProApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    print(f"Starting DataPro Analyst with {args.workers} workers on http://{args.host}:{args.port}")
+    print(f"Shared datasets: {shared_dir}")
+    DataProApplication(app, build_options(args)).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())